@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 # Define which files will be parsed for metadata
 ALLOWED_FILE_PREFIXES = ("Preview_", "Light_", "CRW_", "IMG_",)
@@ -25,6 +26,13 @@ REQUIRED_METADATA_FIELDS = {
     'exif': ['camera', 'gain'] 
 }
 
+# Write diagnostics (available libraries, unreadable headers) to DEBUG_LOG_FILE
+DEBUG = False
+DEBUG_LOG_FILE = 'debug.log'
+
+# Number of threads reading file headers in parallel (the work is IO bound)
+EXTRACTION_THREADS = 8
+
 # --- GLOBAL CONFIGURATION ---
 FILTER_KEYWORDS = {
     'lxtrme': 'L-eXtreme',
@@ -76,9 +84,29 @@ FILE_REGEX = re.compile(
 # Matches folder names starting with YYYYMMDD or YYYY-MM-DD (also allows underscores)
 DATE_FOLDER_RE = re.compile(r'^\d{4}[-_]?\d{2}[-_]?\d{2}')
 
+# The canonical filter names, for O(1) membership tests
+FILTER_NAMES = frozenset(FILTER_KEYWORDS.values())
+
+# One alternation of all filter keywords (whole words only), scanned in a single pass.
+# The rank keeps the FILTER_KEYWORDS order as priority when several keywords are found.
+_FILTER_RE = re.compile(r'\b(' + '|'.join(re.escape(key) for key in FILTER_KEYWORDS) + r')\b', re.IGNORECASE)
+_FILTER_RANK = {key: rank for rank, key in enumerate(FILTER_KEYWORDS)}
+
+# The same keywords, but delimited by underscores or dashes as they appear in file names
+_FILTER_TOKEN_RE = re.compile(r'(?<=[_\-])(' + '|'.join(re.escape(key) for key in FILTER_KEYWORDS) + r')(?=[_\-])', re.IGNORECASE)
+
+# Session folder names repeat for every file in a session, so the result is cached.
+# Header FILTER values are looked up here as well, so the cache is bounded.
+@lru_cache(maxsize=1024)
 def identify_filter(folder_name):
-    for key, formal_name in FILTER_KEYWORDS.items():
-        if re.search(r'\b' + re.escape(key) + r'\b', folder_name, re.IGNORECASE):
-            return formal_name
-    return "Broadband/Unknown"
+    keys = [match.group(1).lower() for match in _FILTER_RE.finditer(folder_name)]
+    if not keys:
+        return "Broadband/Unknown"
+    return FILTER_KEYWORDS[min(keys, key=_FILTER_RANK.__getitem__)]
 
+def identify_filter_token(file_name):
+    """Returns the filter of a keyword delimited by '_' or '-' in the file name, or None."""
+    keys = [match.group(1).lower() for match in _FILTER_TOKEN_RE.finditer(file_name)]
+    if not keys:
+        return None
+    return FILTER_KEYWORDS[min(keys, key=_FILTER_RANK.__getitem__)]
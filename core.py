@@ -1,11 +1,16 @@
 import os
 import csv
 import re
+import logging
+import logging.handlers
+import sys
 
-from pathlib import Path
 from models import SessionMetadata
 from dataclasses import fields
 from collections import Counter
+from operator import itemgetter
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 
 # Extractors available for different file types
 from extractors.fits_extractor import FitsExtractor
@@ -13,17 +18,94 @@ from extractors.exif_extractor import ExifExtractor
 
 import config
 
+# Tolerant per-field patterns used when the strict config.FILE_REGEX does not match.
+# Bin, temperature and rotation can never overlap, so they share one alternation (one named group
+# per field) that a single scan finds. The other fields match digit runs that can start inside
+# another field (e.g. 'Gain180.0s' or 'ISO1600s'), so they keep their own search.
+_TOLERANT_RE = re.compile(
+    r'Bin(?P<bin>\d+)'                         # Bin1
+    r'|_(?P<temperature>-?[\d]+(?:\.[\d]+)?)C' # -10C or -10.5C
+    r'|_(?P<rotation>\d+)deg',                 # 90deg
+    re.IGNORECASE
+)
+_TOLERANT_SEPARATE_RES = {
+    'exposure': re.compile(r'(?P<exposure>[\d.]+)s', re.IGNORECASE),     # 180.0s
+    'gain': re.compile(r'(?:gain|ISO)(?P<gain>\d+)', re.IGNORECASE),     # gain120 or ISO1600
+    'timestamp': re.compile(r'(?P<timestamp>\d{8}-\d{6})'),             # 20250405-214232
+}
+
+# Token helpers for camera detection and validation
+# The token right after the first 'BinN' token (tokens are separated by '_' or '-')
+_CAM_AFTER_BIN_RE = re.compile(r'(?:^|[_\-])Bin\d+[^_\-]*[_\-]+(?P<v>[^_\-]+)', re.IGNORECASE)
+_CAMERA_TOK_RE = re.compile(r'^[A-Za-z0-9]+$')
+
+# The SessionMetadata field names, looked up once instead of via fields() for every file
+_SESSION_FIELDS = tuple(field.name for field in fields(SessionMetadata))
+
+def _is_non_camera_token(token):
+    """
+    True for tokens that sit in the camera position but aren't camera names: 
+    timestamps (20250405 or 20250405-214232) and gain/ISO values (gain120, ISO1600).
+    Plain string checks, as this runs for every file that went through the fallback parser.
+    """
+    if len(token) == 8 and token.isdecimal():
+        return True
+    if len(token) == 15 and token[8] == '-' and token[:8].isdecimal() and token[9:].isdecimal():
+        return True
+    lowered = token.lower()
+    if lowered.startswith('gain'):
+        return lowered[4:5].isdecimal()
+    if lowered.startswith('iso'):
+        return lowered[3:4].isdecimal()
+    return False
+
+def _intern(value):
+    """
+    Interns repeating string values (object, filter, camera, ...) so all rows share one 
+    string object per distinct value. Anything that isn't a string is returned as is.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+def _setup_debug_log():
+    """
+    Attaches a single file handler for config.DEBUG_LOG_FILE to the 'astrophoto' logger,
+    so debug messages don't reopen the file for every write. Messages are buffered in memory 
+    and written in batches (logging flushes the rest at exit). Only active when config.DEBUG is set.
+    """
+    logger = logging.getLogger('astrophoto')
+    if not config.DEBUG or logger.handlers:
+        return
+    file_handler = logging.FileHandler(config.DEBUG_LOG_FILE, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(logging.handlers.MemoryHandler(capacity=1024, target=file_handler))
+    logger.setLevel(logging.DEBUG)
+
 class AstroScannerCore:
     def __init__(self, log_callback=None, progress_callback=None):
+        _setup_debug_log()
         self.log = log_callback or (lambda x: None)
         self.progress = progress_callback or (lambda x, y: None)
         self.extractor_counts = Counter()
 
         # Cache values to avoid redundant folder scans using the SessionMetaData dataclass
         self.session_cache: dict[str, SessionMetadata] = {}
-        self.folder_edit_cache = {}
+        # (session folder, strategy) pairs of which a file header was read successfully. Fields still missing 
+        # after that are missing for the whole session, so its other files of that type are not opened for them again.
+        self.header_read_sessions: set[tuple[str, str]] = set()
+        # Folders (path strings) that contain edits themselves or somewhere below them
+        self.folder_edit_cache: set[str] = set()
+        self._root_prefix_cache = {}
+        # (folder, root) -> (object, telescope, session, valid) as derived from the folder path
+        self._path_meta_cache: dict[tuple, tuple] = {}
+        self._date_folder_cache: dict[str, bool] = {}
         self.stop_requested = False # Flag to signal stopping the scan if needed
 
+        # Metadata is extracted by several threads, this guards the shared counters
+        self._lock = Lock()
+        self._processed_files = 0
+        self._total_files = 0
+        self._progress_step = 50
+
         # 1. Initialize the extractors once
         self._extractors = {
             'fits': FitsExtractor(),
@@ -34,115 +116,244 @@ class AstroScannerCore:
         # (This uses the logic from your config.py)
         self.extension_map = config.FILE_TYPES
 
+        # 3. The fields that trigger a header read, per file extension
+        self._required_fields = {
+            ext: tuple(config.REQUIRED_METADATA_FIELDS.get(strategy, ()))
+            for ext, strategy in self.extension_map.items()
+        }
+
     def scan_folder(self, root_path):
-        root = Path(root_path)
-        valid_extensions = config.FILE_TYPES.keys()
+        """Scans the tree and returns all result rows as a list (empty if the scan was stopped)."""
+        data_rows = list(self.iter_scan(root_path))
+        if self.stop_requested:
+            return []
+        return data_rows
+
+    def iter_scan(self, root_path):
+        """
+        Generator version of scan_folder: yields one result row per indexed file as soon as 
+        it is extracted, so the rows can be streamed to the CSV without holding them all in memory.
+        Stops yielding when a stop is requested.
+        """
+        # Normalized once, so all paths from the walk use the same separators as the root prefix
+        root_str = os.path.normpath(str(root_path))
+        valid_extensions = frozenset(config.FILE_TYPES)
         
-        file_list = []
-        data_rows = []
+        # Image files grouped per folder, so every session is handled by a single worker
+        session_files = []
         
         self.log("Reading the directory tree...")
 
-        # os.walk is often faster for large trees than Path.rglob
-        for current_dir, dirs, files in os.walk(root_path):
+        # A single os.scandir based pass over the tree, see _walk_tree
+        for current_dir, files in self._walk_tree(root_str):
             if self.stop_requested:
-                return []
-
-            curr_p = Path(current_dir)
-            
-            # 1. Check for edits in this specific folder (Shallow check)
-            if self._has_edits_in_folder(files, current_dir):
-                # and if found, mark this folder and all parents up to the root in the cache as containing edits
-                self._bubble_up_edit_status(curr_p, root)
+                return
 
-            # 2. Collect image files from this folder
-            for f in files:
-                file_path = curr_p / f
-                if file_path.suffix.lower() in valid_extensions:
-                    file_list.append(file_path)
+            # Folders that indicate calibration frames (e.g., "darks", "bias", "flats") are checked once
+            is_calibration = self._is_calibration_folder(current_dir)
 
-        total_files = len(file_list)
+            # 1. Check for edits in this specific folder (Shallow check), calibration folders never count as edits
+            if not is_calibration and self._has_edits_in_folder(files):
+                # and if found, mark this folder and all parents up to the root in the cache as containing edits
+                self._bubble_up_edit_status(current_dir, root_str)
+
+            # 2. Skip calibration folders as a whole
+            if is_calibration:
+                continue
+
+            # 3. Collect image files from this folder as plain path strings.
+            # f[f.rfind('.'):] is the extension including the dot (or the last character if there is none).
+            # Files not named like subs are dropped here, before any path parsing or regex work.
+            folder_files = [os.path.join(current_dir, f) for f in files
+                            if f[f.rfind('.'):].lower() in valid_extensions and self._is_valid_file_name(f)]
+            # Folders outside a date (session) folder are dropped as a whole, their files are never counted
+            if folder_files and self._get_folder_info(current_dir, folder_files[0], root_str)[3]:
+                session_files.append(folder_files)
+
+        total_files = sum(len(folder_files) for folder_files in session_files)
         self.log(f"Found {total_files} images. Extracting metadata...")
 
-        for idx, path in enumerate(file_list, start=1):
+        self._processed_files = 0
+        self._total_files = total_files
+        # Report progress about once per percent, but not more often than every 50 files
+        self._progress_step = max(50, total_files // 100)
+
+        # Reading FITS/EXIF headers is IO bound, so sessions are processed by a thread pool.
+        # Results are yielded in folder order to keep the output stable.
+        executor = ThreadPoolExecutor(max_workers=config.EXTRACTION_THREADS)
+        try:
+            for rows in executor.map(self._extract_folder, session_files, [root_str] * len(session_files)):
+                if self.stop_requested:
+                    return
+                yield from rows
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _extract_folder(self, paths, root):
+        """Worker task: extracts the rows for all image files of one folder, in order."""
+        rows = []
+        for path in paths:
             if self.stop_requested:
-                return []
+                break
 
             row = self._extract_metadata(path, root)
             if row:
-                data_rows.append(row)
-            
-            if idx % 50 == 0 or idx == total_files:
-                self.progress(idx, total_files)      
-        
-        return data_rows
+                rows.append(row)
+
+            self._file_processed()
+        return rows
+
+    def _file_processed(self):
+        """Counts a processed file and reports progress every _progress_step files and at the end."""
+        # Reported while holding the lock, so the counts reach the callback in increasing order
+        with self._lock:
+            self._processed_files += 1
+            idx = self._processed_files
+            if idx % self._progress_step == 0 or idx == self._total_files:
+                self.progress(idx, self._total_files)
+
+    def _walk_tree(self, root_path):
+        """
+        Walks the directory tree once using os.scandir and yields (folder, file names) per folder.
+        DirEntry caches the file type from the directory listing, so no extra stat() calls are needed.
+        Folders are visited top-down in the same order as os.walk.
+        When scanning the current directory, paths are yielded without a leading './' (the root itself as '').
+        """
+        root_path = str(root_path)
+        stack = ['' if root_path == os.curdir else root_path]
+        while stack:
+            current_dir = stack.pop()
+            files = []
+            sub_dirs = []
+            try:
+                with os.scandir(current_dir or os.curdir) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if not is_dir:
+                            files.append(entry.name)
+                        elif not entry.is_symlink():
+                            # Like os.walk, symlinked folders are listed as folders but not followed
+                            sub_dirs.append(entry.path if current_dir else entry.name)
+            except OSError:
+                # Unreadable folders are skipped, just like os.walk does
+                continue
+
+            yield current_dir, files
+
+            # Push in reverse so the first sub folder is visited next
+            stack.extend(reversed(sub_dirs))
 
     def save_to_csv(self, data_rows, output_path):
-        """Handles the file IO for CSV generation."""
-        if not data_rows:
-            return
-        keys = data_rows[0].keys()
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            dict_writer = csv.DictWriter(f, fieldnames=keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(data_rows)
+        """
+        Handles the file IO for CSV generation. Accepts a list or any iterable of rows 
+        (e.g. iter_scan) and writes them as they come. Returns the number of rows written; 
+        no file is created when there are no rows.
+        """
+        rows = iter(data_rows)
+        first_row = next(rows, None)
+        if first_row is None:
+            return 0
+        keys = list(first_row.keys())
+        # csv.writer over plain tuples avoids DictWriter's per-field dict lookups
+        get_row = itemgetter(*keys)
+        row_count = 1
+        with open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(keys)
+            writer.writerow(get_row(first_row))
+            for row in rows:
+                writer.writerow(get_row(row))
+                row_count += 1
+        return row_count
 
     def _sync_session_data(self, meta, session: SessionMetadata):
-            """
-            Private helper to synchronize found metadata with the session cache.
-            If a field is missing in meta, it pulls from the session.
-            If a field is present in meta, it updates the session.
-            """
-            for field in fields(session):
-                field_name = field.name
-                # 1. Pull from session if current file is missing the value
-                if not meta.get(field_name):
-                    meta[field_name] = getattr(session, field_name)
-                
-                # 2. Update session if we found a value (from filename or header)
-                if meta.get(field_name):
-                    setattr(session, field_name, meta[field_name])
+        """
+        Private helper to synchronize found metadata with the session cache.
+        If a field is missing in meta, it pulls from the session.
+        If a field is present in meta, it updates the session.
+        """
+        for field_name in _SESSION_FIELDS:
+            value = meta.get(field_name)
+            if value:
+                # Update session if we found a value (from filename or header)
+                setattr(session, field_name, value)
+            else:
+                # Pull from session if current file is missing the value
+                meta[field_name] = getattr(session, field_name)
 
     def _needs_header_extraction(self, ext, meta):
         """
         Returns True if critical metadata is missing. 
         As configured in config.REQUIRED_METADATA_FIELDS.
         """
-        extraction_type = config.FILE_TYPES.get(ext)
-        required_fields = config.REQUIRED_METADATA_FIELDS.get(extraction_type, []) # type: ignore
-        return any(not meta.get(field) for field in required_fields)
+        for field in self._required_fields.get(ext, ()):
+            if not meta.get(field):
+                return True
+        return False
 
     def _bubble_up_edit_status(self, start_path, root_limit):
-        """Recursively marks parent folders as containing edits up to the root."""
+        """Marks the folder and its parent folders as containing edits up to the root (path strings)."""
         temp_p = start_path
-        while temp_p != root_limit and temp_p != temp_p.parent:
-            self.folder_edit_cache[str(temp_p)] = True
-            temp_p = temp_p.parent
-
-    def _has_edits_in_folder(self, files, current_dir):
+        while temp_p != root_limit and temp_p not in self.folder_edit_cache:
+            parent = os.path.dirname(temp_p)
+            if parent == temp_p:
+                break
+            self.folder_edit_cache.add(temp_p)
+            temp_p = parent
+
+    def _has_edits_in_folder(self, files):
         """
         Encapsulates the logic for detecting image edits or stacked results.
-        Returns True if edit indicators are found and the folder is not a calibration directory.
-        """        
-        # 1. Look for edit-related file extensions or "stack" in the filename
+        Returns True if any file has an edit-related extension or "stack" in its name.
+        Calibration folders are excluded by the caller, which checks them once per folder.
+        """
+        edit_indicators = config.EDIT_INDICATORS
         for f in files:
             f_lower = f.lower()
-            if any(f_lower.endswith(ext) for ext in config.EDIT_INDICATORS) or "stack" in f_lower:
-                
-                # 2. Exclude calibration folders (darks, bias, flats) from triggering an 'Edit' flag
-                if not any(k in current_dir.lower() for k in config.CALIBRATION_KEYWORDS):
-                    return True
-                    
+            # str.endswith takes the whole tuple of extensions at once
+            if f_lower.endswith(edit_indicators) or "stack" in f_lower:
+                return True
+
         return False
 
+    def _is_date_folder(self, folder_name):
+        """
+        Returns True if the folder name starts with a date (config.DATE_FOLDER_RE). 
+        Cached per name, since every file in a session asks the same question.
+        """
+        is_date = self._date_folder_cache.get(folder_name)
+        if is_date is None:
+            is_date = bool(config.DATE_FOLDER_RE.match(folder_name))
+            self._date_folder_cache[folder_name] = is_date
+        return is_date
+
+    def _root_prefix(self, root):
+        """
+        Returns the normalized scan root including a trailing separator, so relative parts 
+        can be derived with a plain string slice. Cached because the root is fixed for a scan.
+        """
+        prefix = self._root_prefix_cache.get(root)
+        if prefix is None:
+            root_str = os.path.normpath(str(root)) if str(root) else ''
+            prefix = '' if root_str in ('', '.') else os.path.join(root_str, '')
+            self._root_prefix_cache[root] = prefix
+        return prefix
+
     def _get_metadata_from_path(self, path, root):
         """
         Extracts Object, Telescope, and Session info by analyzing the directory 
         hierarchy relative to the scan root.
         """
         try:
-            # path.relative_to(root) gives us only the folders inside the selected target
-            rel_parts = path.relative_to(Path(root)).parts
+            # Stripping the root prefix gives us only the folders inside the selected target
+            path_str = str(path)
+            prefix = self._root_prefix(root)
+            if not path_str.startswith(prefix):
+                raise ValueError(f"{path_str} is not inside {root}")
+            rel_parts = path_str[len(prefix):].split(os.sep)
             num_parts = len(rel_parts)
             
             # rel_parts index 0 is usually the 'Object' (e.g., M42)
@@ -156,7 +367,7 @@ class AstroScannerCore:
             # Find the session folder by checking parts from right to left
             # (excluding the filename at the end)
             for i in range(num_parts - 2, -1, -1):
-                if config.DATE_FOLDER_RE.match(rel_parts[i]):
+                if self._is_date_folder(rel_parts[i]):
                     session_info = rel_parts[i]
                     # If there's a folder between Object and Session, it's the Telescope
                     if i > 1:
@@ -165,15 +376,17 @@ class AstroScannerCore:
             
             # Fallback if no date folder was found in the relative path
             if not session_info:
-                session_info = path.parent.name if path.parent else ''
+                session_info = os.path.basename(os.path.dirname(path_str))
 
             return obj_name, telescope, session_info
 
         except (ValueError, IndexError):
             # Fallback for files outside the root or unexpected structures
-            session_info = path.parent.name if path.parent else ''
-            telescope = path.parent.parent.name if path.parent and path.parent.parent else 'missing info'
-            obj_name = path.parent.parent.parent.name if path.parent and path.parent.parent and path.parent.parent.parent else ''
+            session_path = os.path.dirname(str(path))
+            telescope_path = os.path.dirname(session_path)
+            session_info = os.path.basename(session_path)
+            telescope = os.path.basename(telescope_path) or 'missing info'
+            obj_name = os.path.basename(os.path.dirname(telescope_path))
             return obj_name, telescope, session_info
 
     def _get_metadata_from_filename(self, file_name):
@@ -195,33 +408,23 @@ class AstroScannerCore:
         """
         meta = {}
         
-        # 1. Search for specific patterns independently
-        patterns = {
-            'exposure': r'(?P<v>[\d.]+)s',
-            'bin': r'Bin(?P<v>\d+)',
-            'gain': r'(?:gain|ISO)(?P<v>\d+)',
-            'temperature': r'_(?P<v>-?[\d]+(?:\.[\d]+)?)C',
-            'rotation': r'_(?P<v>\d+)deg',
-            'timestamp': r'(?P<v>\d{8}-\d{6})'
-        }
-
-        for key, pattern in patterns.items():
-            match = re.search(pattern, file_name, re.IGNORECASE)
+        # 1. Search for the non-overlapping patterns in one pass, the first occurrence of each field wins
+        for match in _TOLERANT_RE.finditer(file_name):
+            key = match.lastgroup
+            if key not in meta:
+                meta[key] = match.group(key)
+        # The patterns that can overlap another field are searched on their own
+        for key, pattern in _TOLERANT_SEPARATE_RES.items():
+            match = pattern.search(file_name)
             if match:
-                meta[key] = match.group('v')
+                meta[key] = match.group(key)
 
         # 2. Attempt to identify camera token
         # Look for a alphanumeric token immediately following the 'Bin' marker
-        tokens = [t for t in re.split(r'[_\-]', file_name) if t]
-        bin_indices = [i for i, t in enumerate(tokens) if re.match(r'Bin\d+', t, re.IGNORECASE)]
-        
-        if bin_indices:
-            bin_idx = bin_indices[0]
-            if bin_idx + 1 < len(tokens):
-                candidate = tokens[bin_idx + 1]
-                # If the next token looks like a camera name (alphanumeric only)
-                if re.match(r'^[A-Za-z0-9]+$', candidate):
-                    meta['camera'] = candidate
+        match = _CAM_AFTER_BIN_RE.search(file_name)
+        # If the next token looks like a camera name (alphanumeric only)
+        if match and _CAMERA_TOK_RE.match(match.group('v')):
+            meta['camera'] = match.group('v')
 
         return meta
 
@@ -233,12 +436,8 @@ class AstroScannerCore:
 
         camera = meta.get('camera')
         # 1. Invalidate camera if it matches non-camera patterns (e.g., 'gain120' or timestamps)
-        if camera:
-            is_timestamp = re.match(r'^\d{8}$|^\d{8}-\d{6}$', camera)
-            is_gain_iso = re.match(r'^(gain|ISO)\d+', camera, re.IGNORECASE)
-
-            if is_timestamp or is_gain_iso:
-                meta['camera'] = None
+        if camera and _is_non_camera_token(str(camera)):
+            meta['camera'] = None
 
         # 2. Invalidate camera if it is actually a known filter name
         if camera and str(camera).lower() in config.FILTER_KEYWORDS:
@@ -249,92 +448,115 @@ class AstroScannerCore:
 
         # 3. Attempt to find filter in the filename if still missing
         if not meta.get('filter'):
-            for key, formal_name in config.FILTER_KEYWORDS.items():
-                # Look for filter keywords delimited by underscores or dashes
-                if re.search(r'[_\-]' + re.escape(key) + r'[_\-]', file_name, re.IGNORECASE):
-                    meta['filter'] = formal_name
-                    break
+            filter_name = config.identify_filter_token(file_name)
+            if filter_name:
+                meta['filter'] = filter_name
 
         # 4. If filter is still missing, attempt to identify it from the session folder name as a last resort, since it's likely consistent for the session
         if not meta.get('filter') or meta['filter'] in [None, 'Broadband/Unknown']:
             meta['filter'] = config.identify_filter(session_info)
 
         # Whatever the case, make sure that filter is set to a known value (either identified or "Broadband/Unknown")
-        if (meta.get('filter') and meta['filter'] not in config.FILTER_KEYWORDS.values()):
+        if (meta.get('filter') and meta['filter'] not in config.FILTER_NAMES):
             meta['filter'] = config.identify_filter(meta.get('filter'))
 
         # If gain is a non numeric string, invalidate it
         gain = meta.get('gain') 
-        if gain and not re.match(r'^\d+$', str(gain)):
+        if gain and not str(gain).isdecimal():
             meta['gain'] = None
 
         return meta
 
-    def _is_valid_file(self, path, session_info):
-        file_name = path.name
+    def _is_valid_file_name(self, file_name):
+        """
+        Cheapest check first: only include image files that start with "Preview_", "Light_", "CRW_", 
+        or "IMG_" and don't end with "_thn.jpg". Applied during the tree walk, so other files never 
+        reach _extract_metadata.
+        """
+        return file_name.startswith(config.ALLOWED_FILE_PREFIXES) and not file_name.endswith(config.SKIPPED_FILE_SUFFIXES)
+
+    def _is_calibration_folder(self, current_dir):
+        """
+        Returns True if the folder path contains a calibration keyword (e.g., "darks", "bias", "flats").
+        Checked once per folder during the walk instead of once per file.
+        """
+        lower_dir = current_dir.lower()
+        return any(keyword in lower_dir for keyword in config.CALIBRATION_KEYWORDS)
+
+    def _is_valid_file(self, session_info):
         # Only include files whose immediate parent folder starts with a date (YYYYMMDD or YYYY-MM-DD)
         parent_name = (session_info or '').strip()
-        if not config.DATE_FOLDER_RE.match(parent_name):
-            # self.log(f"Skipping file not in date folder: {file_name} (parent='{session_info}')")
+        if not self._is_date_folder(parent_name):
+            # self.log(f"Skipping files not in a date folder (parent='{session_info}')")
             return False
 
-        # Only include image files that start with "Preview_", "Light_", "CRW_", or "IMG_" and don't end with "_thn.jpg"
-        if not file_name.startswith(config.ALLOWED_FILE_PREFIXES) or file_name.endswith(config.SKIPPED_FILE_SUFFIXES):
-            # self.log(f"Skipping file: {file_name} (parent='{session_info}')")
-            return False
-        
-        # Skip files that reside in a folder that indicate calibration frames (e.g., "darks", "bias", "flats")
-        lower_path_str = str(path).lower()
-        if any(keyword in lower_path_str for keyword in config.CALIBRATION_KEYWORDS):
-            # self.log(f"Skipping calibration file: {file_name} (parent='{session_info}')")
-            return False
-        
         return True
 
+    def _get_folder_info(self, folder, path, root):
+        """
+        Returns (object, telescope, session, valid) for a file in folder. These only depend on 
+        the folder and the scan root, so they are derived from the first file of every folder and cached.
+        """
+        folder_key = (folder, root)
+        path_info = self._path_meta_cache.get(folder_key)
+        if path_info is None:
+            obj_name, telescope, session_info = self._get_metadata_from_path(path, root)
+            path_info = (obj_name, telescope, session_info, self._is_valid_file(session_info))
+            self._path_meta_cache[folder_key] = path_info
+        return path_info
+
     def _extract_metadata(self, path, root):
         """
         Extracts metadata from the file using multiple strategies:
         1. Basic metadata from the file path structure (Object, Telescope, Session)
         2. Validation based on naming and folder conventions
         3. Metadata from the filename using regex and keyword searches
-        4. Metadata from the file header using the appropriate extractor based on file extension
-        5. Syncing metadata with session cache to fill in missing values and ensure consistency
+        4. Syncing metadata with session cache to fill in missing values and ensure consistency
+        5. Metadata from the file header using the appropriate extractor based on file extension
         6. As a last resort, try to identify filter from session folder name if not found in filename or file header
         7. If still missing major metadata, log a skipped-file note but still include minimal info
         8. Formatting the result into a consistent dictionary for CSV output
         """
-        file_name = path.name
-        session_folder = str(path.parent)  # Cache based on the session folder
-        if session_folder not in self.session_cache:
-            self.session_cache[session_folder] = SessionMetadata()
-        session = self.session_cache[session_folder]
+        # Paths are plain strings from the tree walk, os.path string functions avoid building Path objects
+        session_folder, file_name = os.path.split(path)
 
         # 1. Basic metadata from the file path structure (Object, Telescope, Session)
-        obj_name, telescope, session_info = self._get_metadata_from_path(path, root)
+        # and 2. validation based on folder conventions, worked out once per folder
+        obj_name, telescope, session_info, is_valid = self._get_folder_info(session_folder, path, root)
 
-        # 2. Validation based on naming and folder conventions
-        if not self._is_valid_file(path, session_info):
+        if not is_valid:
             return None
 
+        # Cache based on the session folder
+        if session_folder not in self.session_cache:
+            self.session_cache[session_folder] = SessionMetadata()
+        session = self.session_cache[session_folder]
+
         # 3. Metadata from the filename using regex and keyword searches
         meta = self._get_metadata_from_filename(file_name)
 
         # Cleanup and cross-validate the parsed metadata to correct common misplacements (e.g., camera vs. filter)
         meta = self._cleanup_parsed_metadata(meta, file_name, session_info)
 
+        # 4. Syncing metadata with session cache to fill in missing values and ensure consistency.
         # This pulls values (like camera or filter) already found in previous files.
         self._sync_session_data(meta, session)
 
-        # 4. Conditional Extraction (The "Gatekeeper")
-        ext = path.suffix.lower()
+        # 5. Conditional Extraction (The "Gatekeeper")
+        ext = file_name[file_name.rfind('.'):].lower()
         strategy = config.FILE_TYPES.get(ext, None)
         extractor_func = self._extractors.get(strategy) # type: ignore
 
         # Check if we are still missing critical info after syncing with session
-        if extractor_func and self._needs_header_extraction(ext, meta):
+        header_key = (session_folder, strategy)
+        if extractor_func and header_key not in self.header_read_sessions and self._needs_header_extraction(ext, meta):
             # Get the metadata from the appropriate extractor
             extracted_meta = extractor_func.extract(path)
-            self.extractor_counts[strategy] += 1
+            with self._lock:
+                self.extractor_counts[strategy] += 1
+            # Only a header that actually had values counts as read (e.g. a JPG without EXIF doesn't)
+            if any(extracted_meta.values()):
+                self.header_read_sessions.add(header_key)
 
             # Cleanup and cross-validate the extracted metadata as well, since FITS headers can be messy and inconsistent
             extracted_meta = self._cleanup_parsed_metadata(extracted_meta, file_name, session_info)
@@ -342,12 +564,11 @@ class AstroScannerCore:
             # Sync the new findings back to the session cache for the next files
             self._sync_session_data(extracted_meta, session)
             
-            # Update meta with any new info found from the file header
+            # Update meta with any new info found from the file header.
+            # meta and the session now agree on every field, so no further sync is needed:
+            # header values went into both, and fields the header lacks were already synced above.
             meta.update({k: v for k, v in extracted_meta.items() if v})
 
-        # 5. Syncing metadata with session cache to fill in missing values and ensure consistency
-        self._sync_session_data(meta, session)
-
         # 6. If still missing major metadata, log a skipped-file note
         if not meta:
             self.log(f"Note: filename did not match expected patterns: {file_name}")
@@ -358,26 +579,26 @@ class AstroScannerCore:
 
     def _build_result_row(self, path, meta, obj_name, telescope, session_info):
         # Check both the session folder (parent) and the object folder (grandparent) for signs of edits.
-        session_path_str = str(path.parent)
-        object_path_str = str(path.parent.parent) if path.parent else None
+        session_path_str = os.path.dirname(path)
+        object_path_str = os.path.dirname(session_path_str)
 
         # O(1) Lookup from the cache we built during the walk
         has_edits = "No"
-        if self.folder_edit_cache.get(session_path_str) or self.folder_edit_cache.get(object_path_str):
+        if session_path_str in self.folder_edit_cache or object_path_str in self.folder_edit_cache:
             has_edits = "Yes"
 
         return {
-            'Object': obj_name or 'Unknown',
-            'Filter': meta.get('filter', 'Broadband/Unknown'),
-            'Camera': meta.get('camera', ''),
-            'Telescope': telescope or '',
+            'Object': _intern(obj_name or 'Unknown'),
+            'Filter': _intern(meta.get('filter', 'Broadband/Unknown')),
+            'Camera': _intern(meta.get('camera', '')),
+            'Telescope': _intern(telescope or ''),
             'Exposure': meta.get('exposure', '0'),
             'Bin': meta.get('bin', '1'),
             'Gain': meta.get('gain', ''),
             'Temp': meta.get('temperature', ''),
             'Rotation': meta.get('rotation', ''),
             'Timestamp': meta.get('timestamp', ''),
-            'Session Folder': session_info or '',
+            'Session Folder': _intern(session_info or ''),
             'Edits Detected': has_edits,
-            'Path': str(path)
+            'Path': path
         }
\ No newline at end of file
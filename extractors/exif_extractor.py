@@ -1,3 +1,4 @@
+import logging
 from extractors.fits_extractor import FITS_AVAILABLE
 
 from .base import BaseExtractor
@@ -13,11 +14,12 @@ except ImportError:
 if False:
     import exifread
 
+logger = logging.getLogger('astrophoto.extractors')
+
 class ExifExtractor(BaseExtractor):
     def __init__(self, log_callback=None):
         self.log = log_callback or (lambda x: None)
-        with open('debug.log', 'a') as f:
-            f.write(f"EXIF_AVAILABLE: {EXIF_AVAILABLE}\n")
+        logger.debug(f"EXIF_AVAILABLE: {EXIF_AVAILABLE}")
 
     def extract(self, path):
         """EXIF strategy: returns a dict of metadata."""
@@ -25,7 +27,8 @@ class ExifExtractor(BaseExtractor):
             return {}
         try:
             with open(str(path), 'rb') as f:
-                tags = exifread.process_file(f)
+                # details=False skips the MakerNote and thumbnail, none of the tags below live there
+                tags = exifread.process_file(f, details=False)
                 return {
                     'camera': str(tags.get('Image Model') or ''),
                     'gain': str(tags.get('EXIF ISOSpeedRatings') or ''),
@@ -33,13 +36,14 @@ class ExifExtractor(BaseExtractor):
                     'temperature': str(tags.get('EXIF CameraTemperature') or '')
                 }
         except Exception as e:
-            with open('debug.log', 'a') as f:
-                f.write(f"Error reading EXIF data for {path}: {e}\n")
-                self.log(f"Error reading EXIF data for {path}: {e}")
+            logger.debug(f"Error reading EXIF data for {path}: {e}")
+            self.log(f"Error reading EXIF data for {path}: {e}")
             return {}
         
     def _format_exposure_time(self, exp_time):
-        """Converts EXIF exposure time to a consistent string format in seconds."""
+        """Converts EXIF exposure time to a consistent string format in seconds ('' if the tag is missing)."""
+        if exp_time is None:
+            return ''
         exp_str = str(exp_time)
         if '/' in exp_str:
             num, den = exp_str.split('/')
@@ -1,3 +1,5 @@
+import logging
+import re
 from pathlib import Path
 from .base import BaseExtractor
 from pathlib import Path
@@ -13,30 +15,101 @@ except ImportError:
 if False:
     import astropy.io.fits
 
+logger = logging.getLogger('astrophoto.extractors')
+
+# A FITS header is a sequence of 2880 byte blocks holding 80 character cards, closed by an END card
+FITS_BLOCK_SIZE = 2880
+FITS_CARD_SIZE = 80
+# Capture programs write headers of a few blocks, anything longer is left to astropy
+MAX_HEADER_BLOCKS = 16
+# The keywords read by FitsExtractor.extract
+HEADER_KEYWORDS = frozenset(('INSTRUME', 'CAMERA', 'GAIN', 'ISO', 'CCD-TEMP', 'SET-TEMP', 'EXPTIME', 'FILTER'))
+
+# Card values as defined by the FITS standard (strings are handled separately)
+_STRING_VALUE_RE = re.compile(r" *'((?:[^']|'')*)'")
+_INT_VALUE_RE = re.compile(r'[+-]?\d+')
+_FLOAT_VALUE_RE = re.compile(r'[+-]?(?:\.\d+|\d+(?:\.\d*)?)(?:[DE][+-]?\d+)?', re.IGNORECASE)
+
+def _parse_card_value(field):
+    """
+    Converts the value field of a card (columns 11-80) the way astropy does: strings, 
+    integers, floats and logicals. Returns None for anything else (e.g. complex values, or 
+    long strings that go on in CONTINUE cards).
+    """
+    match = _STRING_VALUE_RE.match(field)
+    if match:
+        value = match.group(1).replace("''", "'").rstrip()
+        # A trailing '&' means the string is continued in the next card
+        return None if value.endswith('&') else value
+    value = field.split('/', 1)[0].strip()
+    if _INT_VALUE_RE.fullmatch(value):
+        return int(value)
+    if _FLOAT_VALUE_RE.fullmatch(value):
+        return float(value.upper().replace('D', 'E'))
+    if value == 'T':
+        return True
+    if value == 'F':
+        return False
+    return None
+
+def _read_primary_header(path):
+    """
+    Reads the HEADER_KEYWORDS values straight from the primary header blocks, so a FITS file 
+    costs a read of a few KB instead of astropy building a complete Header object.
+    Returns None when the header isn't a plain one (no SIMPLE or END card, unexpected values), 
+    the caller then leaves the file to astropy.
+    """
+    values = {}
+    with open(path, 'rb') as f:
+        for block_index in range(MAX_HEADER_BLOCKS):
+            block = f.read(FITS_BLOCK_SIZE)
+            if len(block) < FITS_BLOCK_SIZE or (block_index == 0 and not block.startswith(b'SIMPLE  =')):
+                return None
+            try:
+                text = block.decode('ascii')
+            except UnicodeDecodeError:
+                return None
+            for start in range(0, FITS_BLOCK_SIZE, FITS_CARD_SIZE):
+                keyword = text[start:start + 8].rstrip().upper()
+                if keyword == 'END':
+                    return values
+                # Like astropy, the first card of a repeated keyword wins
+                if keyword not in HEADER_KEYWORDS or keyword in values:
+                    continue
+                if text[start + 8:start + 10] != '= ':
+                    return None
+                value = _parse_card_value(text[start + 10:start + FITS_CARD_SIZE])
+                if value is None:
+                    return None
+                values[keyword] = value
+    return None
+
 class FitsExtractor(BaseExtractor):
     def __init__(self, log_callback=None):
         self.log = log_callback or (lambda x: None)
-        with open('debug.log', 'a') as f:
-            f.write(f"FITS_AVAILABLE: {FITS_AVAILABLE}\n")
+        logger.debug(f"FITS_AVAILABLE: {FITS_AVAILABLE}")
 
     def extract(self, path):
         """FITS strategy: returns a dict of metadata."""
         if not FITS_AVAILABLE:
             return {}
         try:
-            with fits.open(str(path), mode='readonly') as hdul:
-                header = hdul[0].header # type: ignore
-                # Return keys that match our dataclass fields
-
-                return {
-                    'camera': header.get('INSTRUME') or header.get('CAMERA'),
-                    'gain': str(header.get('GAIN', '') or header.get('ISO', '')),
-                    'temperature': str(header.get('CCD-TEMP') or header.get('SET-TEMP', '')),
-                    'exposure': str(header.get('EXPTIME', '')),
-                    'filter': header.get('FILTER')
-                }
+            # Only the primary header is needed, plain headers are read directly from the file.
+            header = _read_primary_header(str(path))
+            if header is None:
+                # Don't memory map the (large) data unit.
+                # Some capture programs omit the END card, which is harmless for reading keywords.
+                header = fits.getheader(str(path), ext=0, memmap=False, ignore_missing_end=True) # type: ignore
+
+            # Return keys that match our dataclass fields
+            return {
+                'camera': header.get('INSTRUME') or header.get('CAMERA'),
+                'gain': str(header.get('GAIN', '') or header.get('ISO', '')),
+                'temperature': str(header.get('CCD-TEMP') or header.get('SET-TEMP', '')),
+                'exposure': str(header.get('EXPTIME', '')),
+                'filter': header.get('FILTER')
+            }
         except Exception as e:
-            with open('debug.log', 'a') as f:
-                f.write(f"Error reading FITS header for {path}: {e}\n") 
-                self.log(f"Error reading FITS header for {path}: {e}")
+            logger.debug(f"Error reading FITS header for {path}: {e}")
+            self.log(f"Error reading FITS header for {path}: {e}")
             return {}
@@ -2,12 +2,18 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
 import time
-from threading import Thread
+import logging
+from threading import Thread, Lock
 
 import config
 
 from core import AstroScannerCore
 
+# Minimum time between two updates of the status box
+LOG_FLUSH_INTERVAL_MS = 250
+# Minimum time in seconds between two updates of the progress bar
+PROGRESS_INTERVAL = 0.1
+
 
 class AstroScannerApp(ctk.CTk):
     def __init__(self):
@@ -53,32 +59,58 @@ class AstroScannerApp(ctk.CTk):
 
         self.selected_path = ""
 
+        # Log messages are collected and written to the status box in batches
+        self._pending_log = []
+        self._log_lock = Lock()
+        self._log_flush_scheduled = False
+        self._last_progress_update = 0.0
+
     def request_stop(self, event=None):
         if self.core:
             self.log("Stop requested. Attempting to halt the scan...")
             self.core.stop_requested = True
 
     def log(self, message):
-        def _append():
-            try:
-                self.status_box.insert("end", f"{message}\n")
-                self.status_box.see("end")
-            except Exception:
-                pass
-        # Schedule UI update on main thread
+        with self._log_lock:
+            self._pending_log.append(message)
+            if self._log_flush_scheduled:
+                return
+            self._log_flush_scheduled = True
+        # Schedule a single UI update on the main thread for everything logged until then
         try:
-            self.after(0, _append)
+            self.after(LOG_FLUSH_INTERVAL_MS, self._flush_log)
         except Exception:
-            _append()
+            self._flush_log()
+
+    def _flush_log(self):
+        """Writes all pending log messages to the status box with a single insert."""
+        with self._log_lock:
+            messages = self._pending_log
+            self._pending_log = []
+            self._log_flush_scheduled = False
+        if not messages:
+            return
+        try:
+            self.status_box.insert("end", "\n".join(messages) + "\n")
+            self.status_box.see("end")
+        except Exception:
+            pass
 
     def update_progress(self, current, total):
-        """Updates the progress bar from 0.0 to 1.0"""
+        """Updates the progress bar from 0.0 to 1.0, at most every PROGRESS_INTERVAL seconds (and at the end)"""
         if total > 0:
-            fraction = current / total
-            percentage = int(fraction * 100)
-            # .after(0, ...) ensures the UI update happens on the main thread
-            self.after(0, lambda: self.progress_bar.set(fraction))
-            self.after(0, lambda: self.progress_label.configure(text=f"Progress: {percentage}% ({current}/{total})"))
+            now = time.monotonic()
+            if current < total and now - self._last_progress_update < PROGRESS_INTERVAL:
+                return
+            self._last_progress_update = now
+            # .after(0, ...) ensures the UI update happens on the main thread, in a single round trip
+            self.after(0, self._apply_progress, current, total)
+
+    def _apply_progress(self, current, total):
+        fraction = current / total
+        percentage = int(fraction * 100)
+        self.progress_bar.set(fraction)
+        self.progress_label.configure(text=f"Progress: {percentage}% ({current}/{total})")
 
     def select_dir(self):
         self.selected_path = filedialog.askdirectory()
@@ -113,8 +145,6 @@ class AstroScannerApp(ctk.CTk):
 
     def run_logic(self):
         import sys
-        with open('debug.log', 'a') as f:
-            f.write(f"Python executable: {sys.executable}\n")
 
         # 1. Update UI state to 'Initializing' mode
         self.after(0, lambda: self.scan_button.configure(state="disabled"))
@@ -126,13 +156,18 @@ class AstroScannerApp(ctk.CTk):
             log_callback=self.log,
             progress_callback=self.update_progress
         )
+        logging.getLogger('astrophoto.gui').debug(f"Python executable: {sys.executable}")
+
+        # 3. Rows are streamed into a temporary CSV, which only replaces the inventory once the scan completed
+        output_file = os.path.join(os.getcwd(), "astro_inventory.csv")
+        partial_file = output_file + ".part"
 
         try:
             # --- Capture Start Time ---
             start_time = time.time()
 
-            # 3. Execute logic
-            data = self.core.scan_folder(self.selected_path)
+            # Execute logic
+            row_count = self.core.save_to_csv(self.core.iter_scan(self.selected_path), partial_file)
 
             counts = self.core.extractor_counts
             breakdown = ",".join([f"{count} {name}" for name, count in counts.items()])
@@ -143,20 +178,19 @@ class AstroScannerApp(ctk.CTk):
 
             if self.core.stop_requested:
                 self.log("Scan was stopped by the user.")
-                self.after(0, lambda: messagebox.showinfo("Scan Stopped", "The scan was stopped. Partial results may not be saved."))
+                self.after(0, lambda: messagebox.showinfo("Scan Stopped", "The scan was stopped. The existing inventory was kept."))
                 return
 
-            if not data:
+            if not row_count:
                 self.after(0, lambda: messagebox.showwarning("No Data", "No compatible files were found."))
                 return
 
-            # 4. Save results        
-            output_file = os.path.join(os.getcwd(), "astro_inventory.csv")
-            self.core.save_to_csv(data, output_file)
+            # 4. Save results by replacing the previous inventory only once the scan has completed
+            os.replace(partial_file, output_file)
             
             # 5. Notify UI of completion
             completion_msg = (
-                f"SUCCESS: {len(data)} files indexed in {duration:.2f} seconds "
+                f"SUCCESS: {row_count} files indexed in {duration:.2f} seconds "
                 f"({breakdown} files opened)"
             )
             self.log(completion_msg)
@@ -169,4 +203,11 @@ class AstroScannerApp(ctk.CTk):
 
             # 7. Ensure scan button is re-enabled even if error occurs
         finally:
+            # Whatever is left of the temporary CSV (stopped, empty or failed scan) is removed,
+            # after a successful os.replace it no longer exists
+            if os.path.exists(partial_file):
+                try:
+                    os.remove(partial_file)
+                except OSError:
+                    pass
             self.after(0, lambda: self.scan_button.configure(state="normal"))
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class SessionMetadata:
     camera: Optional[str] = None
     filter: Optional[str] = None
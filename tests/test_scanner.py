@@ -1,3 +1,5 @@
+import csv
+import os
 import pytest
 import sys
 from pathlib import Path
@@ -7,6 +9,8 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from core import AstroScannerCore
+from extractors.fits_extractor import FitsExtractor, FITS_AVAILABLE
+from extractors.exif_extractor import EXIF_AVAILABLE
 import config
 
 @pytest.fixture
@@ -57,6 +61,27 @@ def test_folder_structure_regex(scanner, tmp_path):
     
     assert match is not None # there is a date folder
 
+def test_fallback_token_search(scanner):
+    """
+    Tests the tolerant search used when a filename doesn't match FILE_REGEX (fields in a different order).
+    """
+    meta = scanner._fallback_token_search("Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_gain456_20250405-214232_001.fits")
+
+    assert meta['exposure'] == "67.0"
+    assert meta['bin'] == "1"
+    assert meta['gain'] == "456"
+    assert meta['temperature'] == "-273"
+    assert meta['rotation'] == "123"
+    assert meta['timestamp'] == "20250405-214232"
+    assert meta['camera'] == "PlayerOne"
+
+def test_fallback_token_search_overlapping_fields(scanner):
+    # The exposure is found even when its digits are glued to another field
+    assert scanner._fallback_token_search("Light_M42_Gain180.0s_001.fits")['exposure'] == "180.0"
+    meta = scanner._fallback_token_search("IMG_ISO1600s_001.cr2")
+    assert meta['exposure'] == "1600"
+    assert meta['gain'] == "1600"
+
 def test_get_metadata_from_path(scanner, tmp_path):
     """
     Tests if the get_metadata_from_path method correctly extracts metadata from a given path.
@@ -70,6 +95,239 @@ def test_get_metadata_from_path(scanner, tmp_path):
     assert telescope == "2000mm Telescope"
     assert session_info == "2024-02-07 Backyard UVIR"
 
+def test_get_metadata_from_path_with_root(scanner, tmp_path):
+    """
+    Tests if the folders above the scan root are ignored when extracting metadata from a path.
+    """
+    test_path = tmp_path / "M42" / "2000mm Telescope" / "2024-02-07 Backyard UVIR" / "Light_M42_001.fits"
+
+    obj_name, telescope, session_info = scanner._get_metadata_from_path(test_path, tmp_path)
+
+    assert obj_name == "M42"
+    assert telescope == "2000mm Telescope"
+    assert session_info == "2024-02-07 Backyard UVIR"
+
+def test_save_to_csv(scanner, session_factory):
+    root, _ = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard UVIR", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_gain456_001.fits")
+    results = scanner.scan_folder(str(root))
+
+    output_file = root / "astro_inventory.csv"
+    scanner.save_to_csv(results, output_file)
+
+    with open(output_file, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    assert len(rows) == 1
+    assert list(rows[0].keys()) == list(results[0].keys())
+    assert rows[0]['Object'] == "M42"
+    assert rows[0]['Filter'] == "UV/IR Cut"
+    assert rows[0]['Gain'] == "456"
+
+def test_save_to_csv_streams_from_iter_scan(scanner, session_factory):
+    root, _ = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard UVIR", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_gain456_001.fits")
+
+    output_file = root / "astro_inventory.csv"
+    assert scanner.save_to_csv(scanner.iter_scan(str(root)), output_file) == 1
+    assert output_file.exists()
+
+    # Nothing to write means no file at all
+    empty_file = root / "empty.csv"
+    assert scanner.save_to_csv(iter([]), empty_file) == 0
+    assert not empty_file.exists()
+
+def test_multiple_sessions(scanner, session_factory):
+    # Several sessions are extracted by different worker threads
+    for date in ("2024-02-07 Backyard", "2024-02-08 Backyard", "2024-02-09 Backyard"):
+        for i in range(1, 4):
+            root, _ = session_factory(target="M42", telescope="2000mm Telescope", date=date, filename=f"Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_00{i}.fits")
+
+    results = scanner.scan_folder(str(root))
+
+    assert len(results) == 9
+    assert sorted(r['Session Folder'] for r in results) == sorted(["2024-02-07 Backyard", "2024-02-08 Backyard", "2024-02-09 Backyard"] * 3)
+    assert all(r['Filter'] == "UV/IR Cut" for r in results)
+
+    # Files of one session are kept together
+    sessions = [r['Session Folder'] for r in results]
+    assert sessions == sorted(sessions, key=sessions.index)
+
+def test_skip_files_by_name(scanner, session_factory):
+    root, _ = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+    # Neither of these follow the naming conventions for subs
+    session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Master_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456.fits")
+    session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="IMG_0001_thn.jpg")
+
+    results = scanner.scan_folder(str(root))
+
+    assert len(results) == 1
+    assert results[0]['Path'].endswith("Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+
+def test_header_read_once_per_session(scanner, session_factory):
+    for i in range(1, 4):
+        root, _ = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard UVIR", filename=f"Light_M42_123deg_67.0s_Bin1_00{i}.fits")
+
+    # The header has a camera and gain but no temperature, so the session never gets one
+    fits_extractor = MagicMock()
+    fits_extractor.extract.return_value = {'camera': 'PlayerOne', 'gain': '456'}
+    scanner._extractors['fits'] = fits_extractor
+
+    results = scanner.scan_folder(str(root))
+
+    assert len(results) == 3
+    assert fits_extractor.extract.call_count == 1
+    assert all(r['Camera'] == "PlayerOne" and r['Gain'] == "456" for r in results)
+
+def _write_fits_header(path, cards):
+    """Writes a FITS file that only consists of a primary header with the given cards."""
+    cards = ["SIMPLE  =                    T", "BITPIX  =                   16", "NAXIS   =                    0"] + cards + ["END"]
+    header = "".join(card.ljust(80) for card in cards)
+    path.write_bytes(header.ljust(-(-len(header) // 2880) * 2880).encode('ascii'))
+
+@pytest.mark.skipif(not (FITS_AVAILABLE and EXIF_AVAILABLE), reason="astropy or exifread is not installed")
+def test_header_read_per_file_type_in_mixed_session(scanner, session_factory):
+    # The preview has no EXIF data at all ("dummy data"), that must not stop the FITS header from being read
+    root, jpg_path = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Preview_M42_001.jpg")
+    _, fits_path = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Light_M42_123deg_67.0s_Bin1_001.fits")
+    _write_fits_header(fits_path, ["INSTRUME= 'ASI294MC'", "GAIN    =                  120", "CCD-TEMP=                -10.0", "EXPTIME =                 67.0", "FILTER  = 'Ha'"])
+
+    # The preview is processed first
+    jpg_row = scanner._extract_metadata(str(jpg_path), str(root))
+    row = scanner._extract_metadata(str(fits_path), str(root))
+
+    assert scanner.extractor_counts == {'exif': 1, 'fits': 1}
+    assert jpg_row['Exposure'] != "None"
+    assert row['Camera'] == "ASI294MC"
+    assert row['Gain'] == "120"
+    assert row['Filter'] == "Ha"
+    assert row['Temp'] == "-10.0"
+    assert row['Exposure'] == "67.0"
+
+@pytest.mark.skipif(not (FITS_AVAILABLE and EXIF_AVAILABLE), reason="astropy or exifread is not installed")
+def test_preview_without_exif_keeps_fits_exposure(scanner, session_factory):
+    # FITS headers without GAIN, so every FITS file would ask for a header read, and a preview without EXIF in between
+    root, fits_path1 = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Light_M42_001.fits")
+    _, jpg_path = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Preview_M42_001.jpg")
+    _, fits_path2 = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Light_M42_002.fits")
+    for fits_path in (fits_path1, fits_path2):
+        _write_fits_header(fits_path, ["INSTRUME= 'ASI294MC'", "EXPTIME =                180.0"])
+
+    rows = [scanner._extract_metadata(str(path), str(root)) for path in (fits_path1, jpg_path, fits_path2)]
+
+    assert [row['Exposure'] for row in rows] == ["180.0", "180.0", "180.0"]
+    assert scanner.extractor_counts == {'fits': 1, 'exif': 1}
+
+@pytest.mark.skipif(not FITS_AVAILABLE, reason="astropy is not installed")
+def test_fits_header_read_directly(tmp_path):
+    cards = [
+        "SIMPLE  =                    T / conforms to FITS standard",
+        "BITPIX  =                   16",
+        "NAXIS   =                    0",
+        "INSTRUME= 'ZWO ASI294MC Pro'   / camera",
+        "GAIN    =                  120",
+        "CCD-TEMP=                -10.0",
+        "EXPTIME =               1.8D+2",
+        "FILTER  = 'O''III   '",
+        "END",
+    ]
+    header = "".join(card.ljust(80) for card in cards)
+    path = tmp_path / "Light_001.fits"
+    path.write_bytes(header.ljust(2880).encode('ascii'))
+
+    meta = FitsExtractor().extract(path)
+
+    assert meta == {'camera': "ZWO ASI294MC Pro", 'gain': "120", 'temperature': "-10.0", 'exposure': "180.0", 'filter': "O'III"}
+
+@pytest.mark.skipif(not FITS_AVAILABLE, reason="astropy is not installed")
+def test_fits_header_long_string_value(tmp_path):
+    # Camera names longer than a card are split over CONTINUE cards
+    path = tmp_path / "Light_001.fits"
+    _write_fits_header(path, [
+        "INSTRUME= 'ZWO ASI294MC Pro with a very long description that does not fit in&'",
+        "CONTINUE  ' one card'",
+        "GAIN    =                  120",
+    ])
+
+    meta = FitsExtractor().extract(path)
+
+    assert meta['camera'] == "ZWO ASI294MC Pro with a very long description that does not fit in one card"
+    assert meta['gain'] == "120"
+
+def test_scan_root_with_trailing_separator(scanner, session_factory):
+    root, file_path = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard UVIR", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_gain456_001.fits")
+
+    results = scanner.scan_folder(str(root) + os.sep)
+
+    assert len(results) == 1
+    assert results[0]['Object'] == "M42"
+    assert results[0]['Telescope'] == "2000mm Telescope"
+    assert results[0]['Path'] == str(file_path)
+
+def test_scan_relative_root(scanner, session_factory, monkeypatch):
+    root, file_path = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard UVIR", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_gain456_001.fits")
+    session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard UVIR", filename="This is a nice edit.tif")
+    monkeypatch.chdir(root)
+
+    results = scanner.scan_folder('.')
+
+    assert len(results) == 1
+    assert results[0]['Object'] == "M42"
+    assert results[0]['Telescope'] == "2000mm Telescope"
+    assert results[0]['Session Folder'] == "2024-02-07 Backyard UVIR"
+    assert results[0]['Edits Detected'] == "Yes"
+    assert results[0]['Path'] == os.path.relpath(file_path, root)
+
+def test_symlinked_folders_are_not_files(scanner, session_factory):
+    root, file_path = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+    # A link to a folder, named like a sub, inside the session
+    link = file_path.parent / "Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_002.fits"
+    try:
+        os.symlink(file_path.parent.parent, link, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks are not supported here")
+
+    results = scanner.scan_folder(str(root))
+
+    # The link is neither indexed as a file nor followed
+    assert len(results) == 1
+    assert results[0]['Path'] == str(file_path)
+
+def test_skip_calibration_folders(scanner, session_factory):
+    root, _ = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+    session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard/darks", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+    session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 flats", filename="Light_M42_123deg_1.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+
+    results = scanner.scan_folder(str(root))
+
+    assert len(results) == 1
+    assert results[0]['Session Folder'] == "2024-02-07 Backyard"
+
+def test_skip_folders_outside_sessions(session_factory):
+    root, _ = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+    # Not inside a date folder, so not part of any session
+    session_factory(target="M42", telescope="2000mm Telescope", date="Processing", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+
+    progress = []
+    scanner = AstroScannerCore(progress_callback=lambda current, total: progress.append((current, total)))
+    results = scanner.scan_folder(str(root))
+
+    assert len(results) == 1
+    assert results[0]['Session Folder'] == "2024-02-07 Backyard"
+    # The skipped file isn't counted either
+    assert progress == [(1, 1)]
+
+def test_stack_in_calibration_folder_is_not_an_edit(scanner, session_factory):
+    root, _ = session_factory(target="M42", telescope="2000mm Telescope", date="2024-02-07 Backyard", filename="Light_M42_123deg_67.0s_-273C_Bin1_PlayerOne_UVIR_gain456_001.fits")
+
+    # A master dark stacked inside the session's calibration folder
+    path2 = root / "M42" / "2000mm Telescope" / "2024-02-07 Backyard" / "darks" / "master_dark_stacked.tif"
+    path2.parent.mkdir(parents=True, exist_ok=True)
+    path2.write_text("fake tif data")
+
+    results = scanner.scan_folder(str(root))
+
+    assert len(results) == 1
+    assert results[0]['Edits Detected'] == "No"
+
 def test_filter_in_session(scanner, session_factory):
     # Create a real folder structure
     # 1 line of code to set up the disk